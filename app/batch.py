@@ -0,0 +1,83 @@
+# app/batch.py
+"""Acciones masivas sobre requerimientos (asignar / cambiar estado).
+
+Cada función valida todos los ids con una sola consulta, aplica los cambios
+con un `INSERT`/`UPDATE` masivo y hace un único commit. Si algún id no existe
+en el tenant no se aplica nada. Los errores se informan con `BatchError`;
+quien llama los traduce a HTTP y refresca el snapshot.
+"""
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .tenancy import get_scoped
+
+VALID_STATUSES = ("PENDIENTE", "COMPLETADO")
+
+
+class BatchError(Exception):
+    pass
+
+
+class BatchInvalid(BatchError):
+    """Parámetros inválidos (sin ids, estado desconocido)."""
+
+
+class BatchNotFound(BatchError):
+    """Algún id no existe en el tenant."""
+
+
+def _checked_ids(db: Session, tenant_id: int, request_ids) -> list[int]:
+    ids = sorted(set(request_ids))
+    if not ids:
+        raise BatchInvalid("No se seleccionaron requerimientos")
+    LR = models.LegalRequest
+    found = db.execute(select(LR.id).where(LR.tenant_id == tenant_id, LR.id.in_(ids))).scalars().all()
+    if len(found) != len(ids):
+        raise BatchNotFound("Requerimiento no encontrado")
+    return ids
+
+
+def assign_many(db: Session, tenant_id: int, request_ids, user_id: int) -> list[int]:
+    """Asigna `user_id` a todos los requerimientos; los no completados quedan PENDIENTE."""
+    if not get_scoped(db, models.User, user_id, tenant_id):
+        raise BatchNotFound("Usuario no encontrado")
+    ids = _checked_ids(db, tenant_id, request_ids)
+
+    A = models.Assignment
+    existing = set(
+        db.execute(select(A.request_id).where(A.assignee_id == user_id, A.request_id.in_(ids))).scalars()
+    )
+    new_rows = [
+        {"tenant_id": tenant_id, "request_id": rid, "assignee_id": user_id}
+        for rid in ids
+        if rid not in existing
+    ]
+    if new_rows:
+        db.execute(insert(A), new_rows)
+
+    LR = models.LegalRequest
+    db.execute(
+        update(LR)
+        .where(LR.id.in_(ids), LR.status != "COMPLETADO")
+        .values(status="PENDIENTE")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return ids
+
+
+def set_status_many(db: Session, tenant_id: int, request_ids, status: str) -> list[int]:
+    if status not in VALID_STATUSES:
+        raise BatchInvalid("Estado inválido")
+    ids = _checked_ids(db, tenant_id, request_ids)
+
+    LR = models.LegalRequest
+    db.execute(
+        update(LR)
+        .where(LR.id.in_(ids))
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return ids
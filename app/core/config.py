@@ -9,3 +9,38 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./juridica_flow.db")
 PRIORITY_DEADLINE_WEIGHT = float(os.getenv("PRIORITY_DEADLINE_WEIGHT", 0.6))
 PRIORITY_COMPLEXITY_WEIGHT = float(os.getenv("PRIORITY_COMPLEXITY_WEIGHT", 0.3))
 PRIORITY_AGE_WEIGHT = float(os.getenv("PRIORITY_AGE_WEIGHT", 0.1))
+
+# Snapshot del backlog: recarga completa cada N segundos (0 = nunca). Es el
+# respaldo para escrituras hechas fuera de este proceso (otros workers, scripts).
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", 60))
+
+# Activar solo si la app corre detrás de un proxy propio que fija (y limpia)
+# los headers X-Tenant / X-Forwarded-For; si no, cualquier cliente podría falsearlos.
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "0") in ("1", "true", "True")
+
+# Multi-tenant: el tenant sale del subdominio de TENANT_BASE_DOMAIN
+# (p. ej. "providencia.juridica.cl"); el header TENANT_HEADER solo se lee con
+# TRUST_PROXY_HEADERS. Sin ninguno de los dos se usa DEFAULT_TENANT.
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant")
+TENANT_BASE_DOMAIN = os.getenv("TENANT_BASE_DOMAIN", "")
+
+
+def _rate_limit(name: str, default: str) -> tuple[float, int]:
+    """Lee "tokens_por_segundo,rafaga" (p. ej. "5,20")."""
+    value = os.getenv(name, default)
+    rate, burst = value.split(",")
+    rate, burst = float(rate), int(burst)
+    if rate <= 0 or burst < 1:
+        raise ValueError(f"{name}={value!r}: la tasa debe ser > 0 y la ráfaga >= 1")
+    return rate, burst
+
+
+# Rate limiting por grupo de rutas y tope de requests simultáneos sobre la base
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") not in ("0", "false", "False")
+RATE_LIMIT_API = _rate_limit("RATE_LIMIT_API", "20,40")
+RATE_LIMIT_PARTIALS = _rate_limit("RATE_LIMIT_PARTIALS", "10,30")
+RATE_LIMIT_ACTIONS = _rate_limit("RATE_LIMIT_ACTIONS", "5,20")
+RATE_LIMIT_PAGES = _rate_limit("RATE_LIMIT_PAGES", "5,20")
+DB_CONCURRENCY_LIMIT = int(os.getenv("DB_CONCURRENCY_LIMIT", 10))
+DB_CONCURRENCY_RETRY_AFTER = int(os.getenv("DB_CONCURRENCY_RETRY_AFTER", 2))
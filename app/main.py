@@ -4,15 +4,32 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse, Response
 
-from .db import Base, engine
+from .db import Base, engine, SessionLocal
 from .routers import users, units, requests, priorities
+from .tenancy import ensure_default_tenant, missing_tenant_columns
+from .ratelimit import RateLimitMiddleware, metrics as ratelimit_metrics
 from . import web
 
+# Una base anterior al modo multi-tenant no sirve tal cual: create_all no altera tablas
+_missing = missing_tenant_columns(engine)
+if _missing:
+    raise RuntimeError(
+        f"Faltan columnas tenant_id en: {', '.join(_missing)}. "
+        "Ejecuta `python scripts/migrate_tenants.py` antes de arrancar."
+    )
+
 # Crear tablas
 Base.metadata.create_all(bind=engine)
 
+# Tenant por defecto (instalaciones de una sola municipalidad)
+with SessionLocal() as _db:
+    ensure_default_tenant(_db)
+
 app = FastAPI(title="Jurídica Flow", version="0.1.0")
 
+# Rate limiting (429) y tope de concurrencia sobre la base (503)
+app.add_middleware(RateLimitMiddleware)
+
 # Routers API
 app.include_router(users.router)
 app.include_router(units.router)
@@ -40,3 +57,7 @@ def favicon():
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    return ratelimit_metrics()
+
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey, Text, DateTime, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .db import Base
 import enum
@@ -14,16 +14,27 @@ class Status(enum.Enum):
     EN_CURSO = "EN_CURSO"
     COMPLETADO = "COMPLETADO"
 
+class Tenant(Base):
+    """Municipalidad. Todas las demás tablas cuelgan de un tenant."""
+    __tablename__ = "tenants"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    slug: Mapped[str] = mapped_column(String(60), unique=True, nullable=False)
+    name: Mapped[str] = mapped_column(String(160), nullable=False)
+
 class Unit(Base):
     __tablename__ = "units"
+    __table_args__ = (UniqueConstraint("tenant_id", "name", name="uq_units_tenant_name"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+    tenant_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenants.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
 
     requests = relationship("LegalRequest", back_populates="unit")
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_tenant_full_name", "tenant_id", "full_name"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenants.id"), nullable=False)
     full_name: Mapped[str] = mapped_column(String(160), nullable=False)
     role: Mapped[str] = mapped_column(String(60), nullable=False)
 
@@ -31,7 +42,13 @@ class User(Base):
 
 class LegalRequest(Base):
     __tablename__ = "legal_requests"
+    __table_args__ = (
+        Index("ix_legal_requests_tenant_status", "tenant_id", "status"),
+        Index("ix_legal_requests_tenant_due_date", "tenant_id", "due_date"),
+        Index("ix_legal_requests_tenant_created_at", "tenant_id", "created_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenants.id"), nullable=False)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     unit_id: Mapped[int] = mapped_column(Integer, ForeignKey("units.id"), nullable=False)
@@ -45,7 +62,12 @@ class LegalRequest(Base):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_tenant_request", "tenant_id", "request_id"),
+        Index("ix_assignments_tenant_assignee", "tenant_id", "assignee_id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, ForeignKey("tenants.id"), nullable=False)
     request_id: Mapped[int] = mapped_column(Integer, ForeignKey("legal_requests.id"), nullable=False)
     assignee_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
 
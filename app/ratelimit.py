@@ -0,0 +1,200 @@
+# app/ratelimit.py
+"""Rate limiting y backpressure para la API y la UI.
+
+- Token bucket por (grupo de rutas, tenant, IP del cliente): `api`,
+  `partials` (polling HTMX), `actions` (formularios POST de la UI) y `pages`
+  (páginas completas). Al agotarse responde 429. Con `TRUST_PROXY_HEADERS`
+  la IP es la última de `X-Forwarded-For` (la que agrega nuestro proxy).
+  El tenant solo cuenta si ya está en el caché de `tenancy`; cualquier otro
+  Host comparte el bucket "-" de esa IP, así que rotar subdominios no da
+  cupo nuevo.
+- Tope de requests simultáneos que tocan la base: si está lleno responde 503
+  en vez de encolar en el threadpool y en el pool de conexiones.
+
+Ambas respuestas llevan `Retry-After`. Los contadores se exponen en `/metrics`.
+El middleware corre en el event loop, así que el estado no necesita locks.
+"""
+import math
+import time
+from collections import OrderedDict, defaultdict
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from .tenancy import _tenant_ids, resolve_tenant_slug
+from .core.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_API,
+    RATE_LIMIT_PARTIALS,
+    RATE_LIMIT_ACTIONS,
+    RATE_LIMIT_PAGES,
+    DB_CONCURRENCY_LIMIT,
+    DB_CONCURRENCY_RETRY_AFTER,
+    TRUST_PROXY_HEADERS,
+)
+
+API_PREFIXES = ("/users", "/units", "/requests", "/priorities")
+
+# Tope de buckets en memoria; al superarlo se descarta el usado hace más tiempo
+MAX_BUCKETS = 10_000
+
+
+def route_group(method: str, path: str) -> str | None:
+    """Grupo de rate limit de una ruta; None si no se limita (docs, health, métricas, estáticos)."""
+    if path.startswith("/ui/partials/"):
+        return "partials"
+    if path == "/ui" or path.startswith("/ui/"):
+        return "actions" if method == "POST" else "pages"
+    if path.startswith(API_PREFIXES):
+        return "api"
+    return None
+
+
+def client_key(scope) -> str:
+    """Tenant + IP del cliente, para que un tenant no consuma el cupo de otro."""
+    request = Request(scope)
+    try:
+        tenant = resolve_tenant_slug(request)
+    except HTTPException:
+        tenant = "-"  # el endpoint responderá el error
+    if tenant not in _tenant_ids:
+        tenant = "-"  # el Host lo elige el cliente: solo se confía en tenants ya resueltos
+
+    ip = request.client.host if request.client else "-"
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            ip = forwarded.split(",")[-1].strip()
+    return f"{tenant}|{ip}"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Token buckets por (grupo, cliente). `limits` mapea grupo -> (tokens/seg, ráfaga)."""
+
+    def __init__(self, limits: dict[str, tuple[float, int]]):
+        self.limits = limits
+        self._buckets: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+        self.allowed = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    def take(self, group: str, client: str, now: float | None = None) -> float:
+        """Consume un token. Devuelve 0 si se permite o los segundos a esperar si no."""
+        rate, burst = self.limits[group]
+        now = time.monotonic() if now is None else now
+        key = (group, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = TokenBucket(float(burst), now)
+        else:
+            bucket.tokens = min(float(burst), bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            self.allowed[group] += 1
+            return 0.0
+        self.rejected[group] += 1
+        return (1.0 - bucket.tokens) / rate
+
+    def reset(self) -> None:
+        self._buckets.clear()
+        self.allowed.clear()
+        self.rejected.clear()
+
+    def metrics(self) -> dict:
+        return {
+            group: {
+                "rate": rate,
+                "burst": burst,
+                "allowed": self.allowed[group],
+                "rejected": self.rejected[group],
+            }
+            for group, (rate, burst) in self.limits.items()
+        } | {"buckets": len(self._buckets)}
+
+
+class ConcurrencyGate:
+    """Tope de requests en curso sobre la base; no encola, rechaza."""
+
+    def __init__(self, limit: int, retry_after: int):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak = 0
+        self.rejected = 0
+
+    def try_enter(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def leave(self) -> None:
+        self.in_flight -= 1
+
+    def metrics(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak, "rejected": self.rejected}
+
+
+limiter = RateLimiter({
+    "api": RATE_LIMIT_API,
+    "partials": RATE_LIMIT_PARTIALS,
+    "actions": RATE_LIMIT_ACTIONS,
+    "pages": RATE_LIMIT_PAGES,
+})
+db_gate = ConcurrencyGate(DB_CONCURRENCY_LIMIT, DB_CONCURRENCY_RETRY_AFTER)
+
+
+def metrics() -> dict:
+    return {"enabled": RATE_LIMIT_ENABLED, "rate_limit": limiter.metrics(), "db_concurrency": db_gate.metrics()}
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: aplica el token bucket y luego el tope de concurrencia."""
+
+    def __init__(self, app, limiter: RateLimiter = limiter, gate: ConcurrencyGate = db_gate):
+        self.app = app
+        self.limiter = limiter
+        self.gate = gate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+        group = route_group(scope["method"], scope["path"])
+        if group is None:
+            return await self.app(scope, receive, send)
+
+        wait = self.limiter.take(group, client_key(scope))
+        if wait:
+            return await _reject(429, "Demasiadas solicitudes", wait)(scope, receive, send)
+
+        if not self.gate.try_enter():
+            return await _reject(503, "Servidor ocupado, reintenta en unos segundos", self.gate.retry_after)(
+                scope, receive, send
+            )
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.leave()
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import date
 from ..db import get_db
 from .. import models, schemas
+from ..tenancy import get_tenant_id
 from ..core.config import PRIORITY_DEADLINE_WEIGHT, PRIORITY_COMPLEXITY_WEIGHT, PRIORITY_AGE_WEIGHT
 
 router = APIRouter(prefix="/priorities", tags=["priorities"])
@@ -34,8 +35,11 @@ def compute_score(req: models.LegalRequest) -> float:
     return round(float(score), 4)
 
 @router.get("/", response_model=list[schemas.PrioritizedTask])
-def prioritized_list(db: Session = Depends(get_db)):
-    q = db.query(models.LegalRequest).filter(models.LegalRequest.status != "COMPLETADO")
+def prioritized_list(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    q = db.query(models.LegalRequest).filter(
+        models.LegalRequest.tenant_id == tenant_id,
+        models.LegalRequest.status != "COMPLETADO",
+    )
     items = []
     for req in q.all():
         assignees = [a.assignee for a in req.assignments]
@@ -2,15 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db import get_db
 from .. import models, schemas
+from ..snapshot import snapshot_for
+from ..tenancy import get_tenant_id, get_scoped
+from ..batch import BatchInvalid, BatchNotFound, assign_many, set_status_many
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
 @router.post("/", response_model=schemas.LegalRequestOut)
-def create_request(payload: schemas.LegalRequestCreate, db: Session = Depends(get_db)):
-    unit = db.query(models.Unit).get(payload.unit_id)
+def create_request(
+    payload: schemas.LegalRequestCreate,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    unit = get_scoped(db, models.Unit, payload.unit_id, tenant_id)
     if not unit:
         raise HTTPException(status_code=404, detail="Unidad no encontrada")
     req = models.LegalRequest(
+        tenant_id=tenant_id,
         title=payload.title,
         description=payload.description,
         unit_id=payload.unit_id,
@@ -21,18 +29,29 @@ def create_request(payload: schemas.LegalRequestCreate, db: Session = Depends(ge
     db.add(req)
     db.commit()
     db.refresh(req)
+    snapshot_for(tenant_id).refresh_requests(db, [req.id])
     return req
 
 @router.get("/", response_model=list[schemas.LegalRequestOut])
-def list_requests(db: Session = Depends(get_db)):
-    return db.query(models.LegalRequest).order_by(models.LegalRequest.created_at.desc()).all()
+def list_requests(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    return (
+        db.query(models.LegalRequest)
+        .filter(models.LegalRequest.tenant_id == tenant_id)
+        .order_by(models.LegalRequest.created_at.desc())
+        .all()
+    )
 
 @router.post("/{request_id}/assign/{user_id}", response_model=schemas.AssignmentOut)
-def assign_request(request_id: int, user_id: int, db: Session = Depends(get_db)):
-    req = db.query(models.LegalRequest).get(request_id)
+def assign_request(
+    request_id: int,
+    user_id: int,
+    db: Session = Depends(get_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    req = get_scoped(db, models.LegalRequest, request_id, tenant_id)
     if not req:
         raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
-    user = db.query(models.User).get(user_id)
+    user = get_scoped(db, models.User, user_id, tenant_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
@@ -40,8 +59,31 @@ def assign_request(request_id: int, user_id: int, db: Session = Depends(get_db))
     if existing:
         return existing
 
-    asg = models.Assignment(request_id=request_id, assignee_id=user_id)
+    asg = models.Assignment(tenant_id=tenant_id, request_id=request_id, assignee_id=user_id)
     db.add(asg)
     db.commit()
     db.refresh(asg)
+    snapshot_for(tenant_id).refresh_requests(db, [request_id])
     return asg
+
+@router.post("/batch/assign", response_model=schemas.BatchResult)
+def batch_assign(payload: schemas.BatchAssign, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    try:
+        ids = assign_many(db, tenant_id, payload.request_ids, payload.user_id)
+    except BatchNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BatchInvalid as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    snapshot_for(tenant_id).refresh_requests(db, ids)
+    return {"request_ids": ids}
+
+@router.post("/batch/status", response_model=schemas.BatchResult)
+def batch_status(payload: schemas.BatchStatus, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    try:
+        ids = set_status_many(db, tenant_id, payload.request_ids, payload.status)
+    except BatchNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BatchInvalid as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    snapshot_for(tenant_id).refresh_requests(db, ids)
+    return {"request_ids": ids}
@@ -2,19 +2,22 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db import get_db
 from .. import models, schemas
+from ..snapshot import snapshot_for
+from ..tenancy import get_tenant_id
 
 router = APIRouter(prefix="/units", tags=["units"])
 
 @router.post("/", response_model=schemas.UnitOut)
-def create_unit(payload: schemas.UnitCreate, db: Session = Depends(get_db)):
-    if db.query(models.Unit).filter(models.Unit.name == payload.name).first():
+def create_unit(payload: schemas.UnitCreate, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    if db.query(models.Unit).filter(models.Unit.tenant_id == tenant_id, models.Unit.name == payload.name).first():
         raise HTTPException(status_code=400, detail="La unidad ya existe")
-    unit = models.Unit(name=payload.name)
+    unit = models.Unit(tenant_id=tenant_id, name=payload.name)
     db.add(unit)
     db.commit()
     db.refresh(unit)
+    snapshot_for(tenant_id).refresh_units(db)
     return unit
 
 @router.get("/", response_model=list[schemas.UnitOut])
-def list_units(db: Session = Depends(get_db)):
-    return db.query(models.Unit).order_by(models.Unit.name).all()
+def list_units(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    return db.query(models.Unit).filter(models.Unit.tenant_id == tenant_id).order_by(models.Unit.name).all()
@@ -2,17 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db import get_db
 from .. import models, schemas
+from ..snapshot import snapshot_for
+from ..tenancy import get_tenant_id
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=schemas.UserOut)
-def create_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
-    user = models.User(full_name=payload.full_name, role=payload.role)
+def create_user(payload: schemas.UserCreate, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    user = models.User(tenant_id=tenant_id, full_name=payload.full_name, role=payload.role)
     db.add(user)
     db.commit()
     db.refresh(user)
+    snapshot_for(tenant_id).refresh_users(db)
     return user
 
 @router.get("/", response_model=list[schemas.UserOut])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(models.User).order_by(models.User.full_name).all()
+def list_users(db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    return db.query(models.User).filter(models.User.tenant_id == tenant_id).order_by(models.User.full_name).all()
@@ -54,6 +54,17 @@ class AssignmentOut(AssignmentBase):
     class Config:
         from_attributes = True
 
+class BatchAssign(BaseModel):
+    request_ids: List[int] = Field(..., min_length=1)
+    user_id: int
+
+class BatchStatus(BaseModel):
+    request_ids: List[int] = Field(..., min_length=1)
+    status: str
+
+class BatchResult(BaseModel):
+    request_ids: List[int]
+
 class PrioritizedTask(BaseModel):
     request: LegalRequestOut
     assignees: List[UserOut]
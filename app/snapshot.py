@@ -0,0 +1,266 @@
+# app/snapshot.py
+"""Snapshot en memoria del backlog para las vistas de tablero.
+
+Las páginas de inicio, prioridades y reportería solo leen unos pocos campos
+escalares de cada requerimiento. En vez de hidratar `LegalRequest` completos
+(identity map, seguimiento de cambios y el `description` de tipo Text), se
+mantiene aquí una copia compacta cargada con consultas de columnas, compartida
+entre requests y refrescada por id después de cada escritura.
+
+Hay un snapshot por tenant: cada uno carga solo sus filas y no comparte
+memoria ni tiempo de carga con los demás.
+
+El snapshot vive en el proceso: los refrescos por id solo ven las escrituras
+hechas por este mismo worker. Se asume un solo worker de uvicorn; con varios,
+o si se escribe desde scripts, `SNAPSHOT_TTL_SECONDS` acota cuánto tiempo se
+puede servir un dato desactualizado.
+"""
+import threading
+import time
+from datetime import date
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .db import get_db
+from . import models
+from .tenancy import get_tenant_id
+from .core.config import (
+    PRIORITY_DEADLINE_WEIGHT,
+    PRIORITY_COMPLEXITY_WEIGHT,
+    PRIORITY_AGE_WEIGHT,
+    SNAPSHOT_TTL_SECONDS,
+)
+
+STATUS_CODES = {"PENDIENTE": 0, "EN_CURSO": 1, "COMPLETADO": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+COMPLETADO = STATUS_CODES["COMPLETADO"]
+
+COMPLEXITY_FACTORS = {1: 0.2, 2: 0.6, 3: 1.0}
+
+
+def score_values(due: int | None, complexity: int | None, created: int | None, today: int) -> float:
+    """Score de prioridad a partir de ordinales de fecha (ver `web.compute_score`)."""
+    deadline_factor = 0.0
+    if due is not None:
+        days_left = due - today
+        deadline_factor = 1.0 if days_left <= 0 else max(0.0, 1.0 - (days_left / 30.0))
+
+    complexity_factor = COMPLEXITY_FACTORS.get(int(complexity or 2), 0.6)
+
+    age_days = today - created if created is not None else 0
+    age_factor = min(1.0, age_days / 60.0)
+
+    score = (
+        PRIORITY_DEADLINE_WEIGHT * deadline_factor
+        + PRIORITY_COMPLEXITY_WEIGHT * complexity_factor
+        + PRIORITY_AGE_WEIGHT * age_factor
+    )
+    return round(float(score), 4)
+
+
+class BacklogRow:
+    """Fila de solo lectura del backlog. Las fechas se guardan como ordinales."""
+
+    __slots__ = ("id", "title", "unit_id", "complexity", "due", "created", "status", "assignees")
+
+    def __init__(self, id, title, unit_id, complexity, due, created, status, assignees):
+        self.id = id
+        self.title = title
+        self.unit_id = unit_id
+        self.complexity = complexity
+        self.due = due
+        self.created = created
+        self.status = status
+        self.assignees = assignees
+
+    @property
+    def due_date(self) -> date | None:
+        return date.fromordinal(self.due) if self.due is not None else None
+
+    @property
+    def status_name(self) -> str:
+        return STATUS_NAMES[self.status]
+
+    @property
+    def is_open(self) -> bool:
+        return self.status != COMPLETADO
+
+    def score(self, today: int) -> float:
+        return score_values(self.due, self.complexity, self.created, today)
+
+
+class BacklogSnapshot:
+    """Backlog de un tenant, compartido entre requests.
+
+    Se carga completo la primera vez que se usa (y de nuevo cuando vence
+    `ttl`) y entre medio se actualiza por id con `refresh_requests`,
+    `refresh_users` y `refresh_units` tras cada commit.
+
+    Cargas y refrescos se serializan con `_write_lock`, consulta incluida: un
+    refresco que llega durante una carga espera a que termine y se aplica
+    encima, así que nunca lo pisa un resultado más viejo. `_lock` solo protege
+    el intercambio de las filas; las filas se reemplazan enteras y los
+    lectores iteran una copia.
+    """
+
+    def __init__(self, tenant_id: int, ttl: float = SNAPSHOT_TTL_SECONDS):
+        self.tenant_id = tenant_id
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._rows: dict[int, BacklogRow] = {}
+        self.users: dict[int, str] = {}
+        self.units: dict[int, str] = {}
+        self.loaded = False
+        self.loaded_at = 0.0
+
+    # ---------- carga ----------
+    def is_stale(self) -> bool:
+        if not self.loaded:
+            return True
+        return bool(self.ttl) and time.monotonic() - self.loaded_at >= self.ttl
+
+    def ensure_loaded(self, db: Session) -> "BacklogSnapshot":
+        if self.is_stale():
+            with self._write_lock:
+                # Otro request pudo cargarlo mientras esperábamos el lock
+                if self.is_stale():
+                    self._load(db)
+        return self
+
+    def load(self, db: Session) -> None:
+        with self._write_lock:
+            self._load(db)
+
+    def _load(self, db: Session) -> None:
+        rows = _fetch_rows(db, self.tenant_id)
+        users = _fetch_users(db, self.tenant_id)
+        units = _fetch_units(db, self.tenant_id)
+        with self._lock:
+            self._rows = rows
+            self.users = users
+            self.units = units
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def refresh_requests(self, db: Session, request_ids) -> None:
+        """Vuelve a leer los requerimientos indicados (o los elimina si ya no existen).
+
+        Sin carga previa no hace nada: la primera carga leerá el estado ya commiteado.
+        Si aparecen usuarios o unidades que el snapshot no conoce (creados por
+        otro worker o un script), también se releen.
+        """
+        ids = set(request_ids)
+        if not ids:
+            return
+        with self._write_lock:
+            if not self.loaded:
+                return
+            rows = _fetch_rows(db, self.tenant_id, ids)
+            if any(uid not in self.users for r in rows.values() for uid in r.assignees):
+                self.users = _fetch_users(db, self.tenant_id)
+            if any(r.unit_id not in self.units for r in rows.values()):
+                self.units = _fetch_units(db, self.tenant_id)
+            with self._lock:
+                for rid in ids:
+                    if rid in rows:
+                        self._rows[rid] = rows[rid]
+                    else:
+                        self._rows.pop(rid, None)
+
+    def refresh_users(self, db: Session) -> None:
+        with self._write_lock:
+            if self.loaded:
+                self.users = _fetch_users(db, self.tenant_id)
+
+    def refresh_units(self, db: Session) -> None:
+        with self._write_lock:
+            if self.loaded:
+                self.units = _fetch_units(db, self.tenant_id)
+
+    def invalidate(self) -> None:
+        with self._write_lock, self._lock:
+            self._rows = {}
+            self.users = {}
+            self.units = {}
+            self.loaded = False
+
+    # ---------- lectura ----------
+    def rows(self) -> list[BacklogRow]:
+        with self._lock:
+            return list(self._rows.values())
+
+    def open_rows(self) -> list[BacklogRow]:
+        return [r for r in self.rows() if r.is_open]
+
+    def user_names(self, ids) -> list[str]:
+        users = self.users
+        return [users[uid] for uid in ids if uid in users]
+
+    def unit_name(self, unit_id: int) -> str | None:
+        return self.units.get(unit_id)
+
+
+def _fetch_users(db: Session, tenant_id: int) -> dict[int, str]:
+    q = select(models.User.id, models.User.full_name).where(models.User.tenant_id == tenant_id)
+    return dict(db.execute(q).all())
+
+
+def _fetch_units(db: Session, tenant_id: int) -> dict[int, str]:
+    q = select(models.Unit.id, models.Unit.name).where(models.Unit.tenant_id == tenant_id)
+    return dict(db.execute(q).all())
+
+
+def _fetch_rows(db: Session, tenant_id: int, ids=None) -> dict[int, BacklogRow]:
+    """Consulta solo columnas escalares; nunca construye objetos ORM."""
+    LR = models.LegalRequest
+    q = (
+        select(LR.id, LR.title, LR.unit_id, LR.complexity, LR.due_date, LR.created_at, LR.status)
+        .where(LR.tenant_id == tenant_id)
+    )
+    a = (
+        select(models.Assignment.request_id, models.Assignment.assignee_id)
+        .where(models.Assignment.tenant_id == tenant_id)
+    )
+    if ids is not None:
+        q = q.where(LR.id.in_(ids))
+        a = a.where(models.Assignment.request_id.in_(ids))
+
+    assignees: dict[int, list[int]] = {}
+    for request_id, assignee_id in db.execute(a):
+        assignees.setdefault(request_id, []).append(assignee_id)
+
+    rows = {}
+    for rid, title, unit_id, complexity, due_date, created_at, status in db.execute(q):
+        rows[rid] = BacklogRow(
+            rid,
+            title,
+            unit_id,
+            int(complexity) if complexity is not None else None,
+            due_date.toordinal() if due_date else None,
+            created_at.date().toordinal() if created_at else None,
+            STATUS_CODES.get(status, 0),
+            tuple(assignees.get(rid, ())),
+        )
+    return rows
+
+
+_snapshots_lock = threading.Lock()
+_snapshots: dict[int, BacklogSnapshot] = {}
+
+
+def snapshot_for(tenant_id: int) -> BacklogSnapshot:
+    snapshot = _snapshots.get(tenant_id)
+    if snapshot is None:
+        with _snapshots_lock:
+            snapshot = _snapshots.setdefault(tenant_id, BacklogSnapshot(tenant_id))
+    return snapshot
+
+
+def get_backlog(
+    tenant_id: int = Depends(get_tenant_id),
+    db: Session = Depends(get_db),
+) -> BacklogSnapshot:
+    return snapshot_for(tenant_id).ensure_loaded(db)
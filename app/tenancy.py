@@ -0,0 +1,91 @@
+# app/tenancy.py
+"""Resolución del tenant (municipalidad) para cada request.
+
+Con `TENANT_BASE_DOMAIN` el subdominio manda. El header `TENANT_HEADER` solo
+se considera con `TRUST_PROXY_HEADERS` y, si también hay subdominio, tiene que
+coincidir con él. Sin ninguno de los dos se usa `DEFAULT_TENANT`. El id de
+cada slug se cachea en memoria para no consultar `tenants` en cada request.
+"""
+import threading
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+from .db import get_db
+from . import models
+from .core.config import DEFAULT_TENANT, TENANT_HEADER, TENANT_BASE_DOMAIN, TRUST_PROXY_HEADERS
+
+_lock = threading.Lock()
+_tenant_ids: dict[str, int] = {}
+
+TENANT_TABLES = ("units", "users", "legal_requests", "assignments")
+
+
+def missing_tenant_columns(bind) -> list[str]:
+    """Tablas existentes sin `tenant_id` (bases anteriores al modo multi-tenant)."""
+    insp = inspect(bind)
+    return [
+        table for table in TENANT_TABLES
+        if insp.has_table(table) and "tenant_id" not in {c["name"] for c in insp.get_columns(table)}
+    ]
+
+
+def resolve_tenant_slug(request: Request) -> str:
+    host_slug = None
+    if TENANT_BASE_DOMAIN:
+        host = request.headers.get("host", "").split(":")[0].lower()
+        base = TENANT_BASE_DOMAIN.lower()
+        if host == base:
+            host_slug = DEFAULT_TENANT
+        elif host.endswith("." + base):
+            host_slug = host[: -len(base) - 1]
+        else:
+            raise HTTPException(status_code=400, detail="Host no pertenece al dominio configurado")
+
+    header_slug = None
+    if TRUST_PROXY_HEADERS:
+        value = request.headers.get(TENANT_HEADER)
+        if value:
+            header_slug = value.strip().lower()
+
+    if host_slug and header_slug and header_slug != host_slug:
+        raise HTTPException(status_code=400, detail="El tenant del header no coincide con el host")
+    return host_slug or header_slug or DEFAULT_TENANT
+
+
+def tenant_id_for(db: Session, slug: str) -> int | None:
+    tenant_id = _tenant_ids.get(slug)
+    if tenant_id is None:
+        tenant_id = db.execute(select(models.Tenant.id).where(models.Tenant.slug == slug)).scalar()
+        if tenant_id is not None:
+            with _lock:
+                _tenant_ids[slug] = tenant_id
+    return tenant_id
+
+
+def get_tenant_id(request: Request, db: Session = Depends(get_db)) -> int:
+    slug = resolve_tenant_slug(request)
+    tenant_id = tenant_id_for(db, slug)
+    if tenant_id is None:
+        raise HTTPException(status_code=404, detail=f"Tenant '{slug}' no existe")
+    return tenant_id
+
+
+def ensure_default_tenant(db: Session) -> int:
+    """Crea el tenant por defecto si falta (instalaciones de una sola municipalidad)."""
+    tenant_id = tenant_id_for(db, DEFAULT_TENANT)
+    if tenant_id is None:
+        tenant = models.Tenant(slug=DEFAULT_TENANT, name=DEFAULT_TENANT)
+        db.add(tenant)
+        db.commit()
+        tenant_id = tenant.id
+    return tenant_id
+
+
+def get_scoped(db: Session, model, obj_id: int, tenant_id: int):
+    """Como `db.get`, pero devuelve None si el objeto es de otro tenant."""
+    obj = db.get(model, obj_id)
+    if obj is None or obj.tenant_id != tenant_id:
+        return None
+    return obj
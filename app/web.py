@@ -8,15 +8,14 @@ from fastapi.templating import Jinja2Templates
 TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .db import get_db
 from . import models
-from .core.config import (
-    PRIORITY_DEADLINE_WEIGHT,
-    PRIORITY_COMPLEXITY_WEIGHT,
-    PRIORITY_AGE_WEIGHT,
-)
+from .snapshot import BacklogSnapshot, get_backlog, score_values
+from .tenancy import get_tenant_id, get_scoped
+from .batch import BatchInvalid, BatchNotFound, assign_many, set_status_many
 
 router = APIRouter(tags=["ui"])
 templates = Jinja2Templates(directory="templates")
@@ -31,40 +30,50 @@ def compute_score(req: models.LegalRequest) -> float:
       - age_factor: sube con la antigüedad (cap en 60 días)
     Pesos vienen de core.config (PRIORITY_*_WEIGHT).
     """
-    today = date.today()
-
-    # deadline
-    deadline_factor = 0.0
-    if req.due_date:
-        days_left = (req.due_date - today).days
-        deadline_factor = 1.0 if days_left <= 0 else max(0.0, 1.0 - (days_left / 30.0))
-
-    # complexity
-    complexity_map = {1: 0.2, 2: 0.6, 3: 1.0}
-    complexity = getattr(req, "complexity", 2)
-    complexity_factor = complexity_map.get(int(complexity), 0.6)
-
-    # age
-    age_days = (today - req.created_at.date()).days if getattr(req, "created_at", None) else 0
-    age_factor = min(1.0, age_days / 60.0)
-
-    score = (
-        PRIORITY_DEADLINE_WEIGHT * deadline_factor
-        + PRIORITY_COMPLEXITY_WEIGHT * complexity_factor
-        + PRIORITY_AGE_WEIGHT * age_factor
+    due = req.due_date.toordinal() if req.due_date else None
+    created = req.created_at.date().toordinal() if getattr(req, "created_at", None) else None
+    return score_values(due, getattr(req, "complexity", 2), created, date.today().toordinal())
+
+
+def _descriptions(db: Session, tenant_id: int, rows) -> dict[int, str]:
+    """Descripciones para los tooltips, solo de las filas que se van a renderizar."""
+    ids = [r.id for r in rows]
+    if not ids:
+        return {}
+    LR = models.LegalRequest
+    q = select(LR.id, LR.description).where(
+        LR.tenant_id == tenant_id,
+        LR.id.in_(ids),
+        LR.description.is_not(None),
+        LR.description != "",
     )
-    return round(float(score), 4)
+    return dict(db.execute(q).all())
+
+
+def _users(db: Session, tenant_id: int) -> list[models.User]:
+    return db.query(models.User).filter(models.User.tenant_id == tenant_id).order_by(models.User.full_name).all()
+
+
+def _units(db: Session, tenant_id: int) -> list[models.Unit]:
+    return db.query(models.Unit).filter(models.Unit.tenant_id == tenant_id).order_by(models.Unit.name).all()
+
+
+def _priority_items(backlog: BacklogSnapshot) -> list:
+    today = date.today().toordinal()
+    items = [(r, backlog.user_names(r.assignees), r.score(today)) for r in backlog.open_rows()]
+    items.sort(key=lambda t: t[2], reverse=True)
+    return items
 
 
 # ------------------ REPORTERÍA ------------------
 
 @router.get("/ui/reports", response_class=HTMLResponse)
-def ui_reports(request: Request, db: Session = Depends(get_db)):
-    # Trae todo una vez
-    reqs = db.query(models.LegalRequest).all()
-    users = {u.id: u for u in db.query(models.User).all()}
-    units = {u.id: u for u in db.query(models.Unit).all()}
-    today = date.today()
+def ui_reports(request: Request, backlog: BacklogSnapshot = Depends(get_backlog)):
+    # Todo sale del snapshot compartido (sin consultas por request)
+    reqs = backlog.rows()
+    users = backlog.users
+    units = backlog.units
+    today = date.today().toordinal()
 
     # ---------- Métricas por usuario (carga) ----------
     per_user_counts = defaultdict(int)
@@ -73,11 +82,11 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
     per_user_bins = defaultdict(lambda: {"0-0.33": 0, "0.34-0.66": 0, "0.67-1.0": 0})
 
     for r in reqs:
-        if r.status == "COMPLETADO":
+        if not r.is_open:
             continue
-        score = compute_score(r)
-        is_overdue = (r.due_date and r.due_date < today)
-        assignees = [a.assignee_id for a in r.assignments]
+        score = r.score(today)
+        is_overdue = r.due is not None and r.due < today
+        assignees = r.assignees
         if not assignees:
             continue
         for uid in assignees:
@@ -93,7 +102,7 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
                 per_user_bins[uid]["0.67-1.0"] += 1
 
     user_ids = list(per_user_counts.keys())
-    user_labels = [users[uid].full_name for uid in user_ids]
+    user_labels = [users.get(uid, f"¿(Usuario #{uid})?") for uid in user_ids]
     user_open_counts = [per_user_counts[uid] for uid in user_ids]
     user_total_score = [round(per_user_score[uid], 3) for uid in user_ids]
     user_overdue_counts = [per_user_overdue.get(uid, 0) for uid in user_ids]
@@ -109,11 +118,11 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
     unit_avg_complexity_n = defaultdict(int)
 
     for r in reqs:
-        unit_name = units[r.unit_id].name if r.unit_id in units else "¿(Sin unidad)?"
+        unit_name = units[r.unit_id] if r.unit_id in units else "¿(Sin unidad)?"
         unit_total[unit_name] += 1
-        if r.status != "COMPLETADO":
+        if r.is_open:
             unit_open[unit_name] += 1
-        if r.due_date and r.due_date < today and r.status != "COMPLETADO":
+        if r.due is not None and r.due < today and r.is_open:
             unit_overdue[unit_name] += 1
         if r.complexity:
             unit_avg_complexity_sum[unit_name] += int(r.complexity)
@@ -133,11 +142,11 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
     complexity_counts = {1: 0, 2: 0, 3: 0}
 
     for r in reqs:
-        assigned = len(r.assignments) > 0
+        assigned = len(r.assignees) > 0
         if not assigned:
             status_counts["SIN_ASIGNAR"] += 1
         else:
-            if r.status == "COMPLETADO":
+            if not r.is_open:
                 status_counts["COMPLETADO"] += 1
             else:
                 status_counts["PENDIENTE"] += 1
@@ -147,7 +156,7 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
     # ---------- Envejecimiento ----------
     aging_buckets = {"0-7": 0, "8-30": 0, "31-60": 0, ">60": 0}
     for r in reqs:
-        age = (today - r.created_at.date()).days if r.created_at else 0
+        age = today - r.created if r.created is not None else 0
         if age <= 7:
             aging_buckets["0-7"] += 1
         elif age <= 30:
@@ -160,7 +169,7 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
     # ---------- SLA simple ----------
     due_soon_unassigned = 0
     for r in reqs:
-        if r.due_date and 0 <= (r.due_date - today).days <= 7 and len(r.assignments) == 0 and r.status != "COMPLETADO":
+        if r.due is not None and 0 <= r.due - today <= 7 and not r.assignees and r.is_open:
             due_soon_unassigned += 1
 
     return templates.TemplateResponse(
@@ -194,84 +203,117 @@ def ui_reports(request: Request, db: Session = Depends(get_db)):
 # ------------------ PÁGINAS (NAV) ------------------
 
 @router.get("/ui", response_class=HTMLResponse)
-def home(request: Request, db: Session = Depends(get_db)):
+def home(request: Request, backlog: BacklogSnapshot = Depends(get_backlog)):
     """Inicio: próximos vencimientos y asignados."""
-    today = date.today()
-    q = db.query(models.LegalRequest).filter(models.LegalRequest.status != "COMPLETADO")
+    today = date.today().toordinal()
     upcoming = []
-    for r in q.all():
-        if r.due_date:
-            days = (r.due_date - today).days
+    for r in backlog.open_rows():
+        if r.due is not None:
+            days = r.due - today
             if -3 <= days <= 14:
                 upcoming.append({
                     "request": r,
-                    "assignees": [a.assignee for a in r.assignments],
-                    "score": compute_score(r),
+                    "assignees": backlog.user_names(r.assignees),
+                    "unit": backlog.unit_name(r.unit_id),
+                    "score": r.score(today),
                 })
-    upcoming.sort(key=lambda x: (x["request"].due_date or today, -x["score"]))
+    upcoming.sort(key=lambda x: (x["request"].due, -x["score"]))
     return templates.TemplateResponse("home.html", {"request": request, "upcoming": upcoming, "active": "home"})
 
 
 @router.get("/ui/requests", response_class=HTMLResponse)
-def ui_requests(request: Request, db: Session = Depends(get_db)):
-    users = db.query(models.User).order_by(models.User.full_name).all()
-    units = db.query(models.Unit).order_by(models.Unit.name).all()
-    reqs = db.query(models.LegalRequest).order_by(models.LegalRequest.created_at.desc()).all()
-    items = []
-    for r in reqs:
-        if r.status != "COMPLETADO":
-            items.append((r, [a.assignee for a in r.assignments], compute_score(r)))
-    items.sort(key=lambda t: t[2], reverse=True)
+def ui_requests(
+    request: Request,
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    users = _users(db, backlog.tenant_id)
+    units = _units(db, backlog.tenant_id)
+    reqs = sorted(backlog.rows(), key=lambda r: r.id, reverse=True)
     return templates.TemplateResponse(
         "requests_page.html",
-        {"request": request, "users": users, "units": units, "requests": reqs, "priorities": items, "active": "requests"},
+        {
+            "request": request,
+            "users": users,
+            "units": units,
+            "requests": reqs,
+            "priorities": _priority_items(backlog),
+            "backlog": backlog,
+            "descriptions": _descriptions(db, backlog.tenant_id, reqs),
+            "active": "requests",
+        },
     )
 
 
 @router.get("/ui/users", response_class=HTMLResponse)
-def ui_users(request: Request, db: Session = Depends(get_db)):
-    users = db.query(models.User).order_by(models.User.full_name).all()
+def ui_users(request: Request, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    users = _users(db, tenant_id)
     return templates.TemplateResponse("users_page.html", {"request": request, "users": users, "active": "users"})
 
 
 @router.get("/ui/units", response_class=HTMLResponse)
-def ui_units(request: Request, db: Session = Depends(get_db)):
-    units = db.query(models.Unit).order_by(models.Unit.name).all()
+def ui_units(request: Request, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    units = _units(db, tenant_id)
     return templates.TemplateResponse("units_page.html", {"request": request, "units": units, "active": "units"})
 
 
 # ------------------ PARTIALS (HTMX) ------------------
 
 @router.get("/ui/partials/users", response_class=HTMLResponse)
-def partial_users(request: Request, db: Session = Depends(get_db)):
-    users = db.query(models.User).order_by(models.User.full_name).all()
+def partial_users(request: Request, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    users = _users(db, tenant_id)
     return templates.TemplateResponse("partials/users.html", {"request": request, "users": users})
 
 
 @router.get("/ui/partials/units", response_class=HTMLResponse)
-def partial_units(request: Request, db: Session = Depends(get_db)):
-    units = db.query(models.Unit).order_by(models.Unit.name).all()
+def partial_units(request: Request, db: Session = Depends(get_db), tenant_id: int = Depends(get_tenant_id)):
+    units = _units(db, tenant_id)
     return templates.TemplateResponse("partials/units.html", {"request": request, "units": units})
 
 
 @router.get("/ui/partials/requests", response_class=HTMLResponse)
-def partial_requests(request: Request, db: Session = Depends(get_db)):
-    reqs = db.query(models.LegalRequest).order_by(models.LegalRequest.created_at.desc()).all()
-    return templates.TemplateResponse("partials/requests.html", {"request": request, "requests": reqs})
+def partial_requests(
+    request: Request,
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    reqs = sorted(backlog.rows(), key=lambda r: r.id, reverse=True)
+    return templates.TemplateResponse(
+        "partials/requests.html",
+        {
+            "request": request,
+            "requests": reqs,
+            "backlog": backlog,
+            "descriptions": _descriptions(db, backlog.tenant_id, reqs),
+        },
+    )
 
 
 @router.get("/ui/partials/priorities", response_class=HTMLResponse)
-def partial_priorities(request: Request, db: Session = Depends(get_db)):
-    reqs = db.query(models.LegalRequest).filter(models.LegalRequest.status != "COMPLETADO").all()
-    items = [(r, [a.assignee for a in r.assignments], compute_score(r)) for r in reqs]
-    items.sort(key=lambda t: t[2], reverse=True)
-    return templates.TemplateResponse("partials/priorities.html", {"request": request, "priorities": items})
+def partial_priorities(
+    request: Request,
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    items = _priority_items(backlog)
+    return templates.TemplateResponse(
+        "partials/priorities.html",
+        {
+            "request": request,
+            "priorities": items,
+            "descriptions": _descriptions(db, backlog.tenant_id, [r for r, _, _ in items]),
+        },
+    )
 
 
 @router.get("/ui/partials/assign_form", response_class=HTMLResponse)
-def partial_assign_form(request: Request, db: Session = Depends(get_db)):
-    users = db.query(models.User).order_by(models.User.full_name).all()
-    reqs = db.query(models.LegalRequest).order_by(models.LegalRequest.created_at.desc()).all()
+def partial_assign_form(
+    request: Request,
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    users = _users(db, backlog.tenant_id)
+    reqs = sorted(backlog.rows(), key=lambda r: r.id, reverse=True)
     return templates.TemplateResponse("partials/assign_form.html", {"request": request, "users": users, "requests": reqs})
 
 
@@ -283,11 +325,13 @@ def create_user(
     full_name: str = Form(...),
     role: str = Form(...),
     db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
 ):
-    user = models.User(full_name=full_name, role=role)
+    user = models.User(tenant_id=backlog.tenant_id, full_name=full_name, role=role)
     db.add(user)
     db.commit()
-    return partial_users(request, db)
+    backlog.refresh_users(db)
+    return partial_users(request, db, backlog.tenant_id)
 
 
 @router.post("/ui/create_unit", response_class=HTMLResponse)
@@ -295,13 +339,15 @@ def create_unit(
     request: Request,
     name: str = Form(...),
     db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
 ):
-    if db.query(models.Unit).filter(models.Unit.name == name).first():
+    if db.query(models.Unit).filter(models.Unit.tenant_id == backlog.tenant_id, models.Unit.name == name).first():
         raise HTTPException(status_code=400, detail="La unidad ya existe")
-    unit = models.Unit(name=name)
+    unit = models.Unit(tenant_id=backlog.tenant_id, name=name)
     db.add(unit)
     db.commit()
-    return partial_units(request, db)
+    backlog.refresh_units(db)
+    return partial_units(request, db, backlog.tenant_id)
 
 
 @router.post("/ui/create_request", response_class=HTMLResponse)
@@ -313,13 +359,15 @@ def create_request(
     complexity: int = Form(2),
     due_date: str | None = Form(None),
     db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
 ):
     due = date.fromisoformat(due_date) if due_date else None
 
-    if not db.query(models.Unit).get(unit_id):
+    if not get_scoped(db, models.Unit, unit_id, backlog.tenant_id):
         raise HTTPException(status_code=404, detail="Unidad no encontrada")
 
     r = models.LegalRequest(
+        tenant_id=backlog.tenant_id,
         title=title,
         description=description,
         unit_id=unit_id,
@@ -329,10 +377,11 @@ def create_request(
     )
     db.add(r)
     db.commit()
+    backlog.refresh_requests(db, [r.id])
 
     if request.headers.get("HX-Request") == "true":
         return HTMLResponse(status_code=204, headers={"HX-Redirect": "/ui/requests"})
-    return partial_requests(request, db)
+    return partial_requests(request, db, backlog)
 
 
 @router.post("/ui/set_status", response_class=HTMLResponse)
@@ -341,8 +390,9 @@ def set_status(
     request_id: int = Form(...),
     status: str = Form(...),
     db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
 ):
-    req = db.query(models.LegalRequest).get(request_id)
+    req = get_scoped(db, models.LegalRequest, request_id, backlog.tenant_id)
     if not req:
         raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
 
@@ -351,7 +401,8 @@ def set_status(
 
     req.status = status
     db.commit()
-    return partial_requests(request, db)
+    backlog.refresh_requests(db, [request_id])
+    return partial_requests(request, db, backlog)
 
 
 @router.post("/ui/assign", response_class=HTMLResponse)
@@ -360,18 +411,59 @@ def assign_request(
     request_id: int = Form(...),
     user_id: int = Form(...),
     db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
 ):
-    req = db.query(models.LegalRequest).get(request_id)
-    user = db.query(models.User).get(user_id)
+    req = get_scoped(db, models.LegalRequest, request_id, backlog.tenant_id)
+    user = get_scoped(db, models.User, user_id, backlog.tenant_id)
     if not req or not user:
         raise HTTPException(status_code=404, detail="Requerimiento o usuario no existe")
 
     if not db.query(models.Assignment).filter_by(request_id=request_id, assignee_id=user_id).first():
-        db.add(models.Assignment(request_id=request_id, assignee_id=user_id))
+        db.add(models.Assignment(tenant_id=backlog.tenant_id, request_id=request_id, assignee_id=user_id))
 
     if req.status != "COMPLETADO":
         req.status = "PENDIENTE"
 
     db.commit()
-    return partial_priorities(request, db)
+    backlog.refresh_requests(db, [request_id])
+    return partial_priorities(request, db, backlog)
+
+
+# ------------------ ACCIONES MASIVAS ------------------
+# Un solo commit y un solo re-render sin importar cuántas filas se marquen.
+
+@router.post("/ui/batch_status", response_class=HTMLResponse)
+def batch_set_status(
+    request: Request,
+    request_ids: list[int] = Form(...),
+    status: str = Form(...),
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    try:
+        ids = set_status_many(db, backlog.tenant_id, request_ids, status)
+    except BatchNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BatchInvalid as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    backlog.refresh_requests(db, ids)
+    return partial_requests(request, db, backlog)
+
+
+@router.post("/ui/batch_assign", response_class=HTMLResponse)
+def batch_assign(
+    request: Request,
+    request_ids: list[int] = Form(...),
+    user_id: int = Form(...),
+    db: Session = Depends(get_db),
+    backlog: BacklogSnapshot = Depends(get_backlog),
+):
+    try:
+        ids = assign_many(db, backlog.tenant_id, request_ids, user_id)
+    except BatchNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BatchInvalid as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    backlog.refresh_requests(db, ids)
+    return partial_priorities(request, db, backlog)
 
@@ -0,0 +1,26 @@
+"""Alta de una municipalidad (tenant). No se expone por HTTP a propósito.
+Ejecuta: `python scripts/create_tenant.py <slug> "<Nombre>"`
+"""
+import sys
+
+from app.db import Base, engine, SessionLocal
+from app import models
+
+def create_tenant(slug: str, name: str):
+    Base.metadata.create_all(bind=engine)
+    slug = slug.strip().lower()
+    db = SessionLocal()
+    try:
+        if db.query(models.Tenant).filter_by(slug=slug).first():
+            print(f"El tenant '{slug}' ya existe")
+            return
+        db.add(models.Tenant(slug=slug, name=name))
+        db.commit()
+        print(f"Tenant '{slug}' creado")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    create_tenant(sys.argv[1], sys.argv[2])
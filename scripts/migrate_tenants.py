@@ -0,0 +1,91 @@
+"""Migra una base anterior al modo multi-tenant.
+
+- Agrega `tenant_id` a units, users, legal_requests y assignments, y lo
+  rellena con el tenant por defecto (`DEFAULT_TENANT`).
+- Cambia el único global de `units.name` por uno por tenant (tenant_id, name).
+- Crea los índices compuestos por tenant.
+
+Es idempotente: se puede correr más de una vez.
+Ejecuta: `python scripts/migrate_tenants.py` (con el server apagado).
+"""
+from sqlalchemy import inspect, select, text
+
+from app.db import Base, engine
+from app import models
+from app.core.config import DEFAULT_TENANT
+from app.tenancy import TENANT_TABLES, missing_tenant_columns
+
+def _default_tenant_id(conn) -> int:
+    tenants = models.Tenant.__table__
+    tenant_id = conn.execute(select(tenants.c.id).where(tenants.c.slug == DEFAULT_TENANT)).scalar()
+    if tenant_id is None:
+        tenant_id = conn.execute(
+            tenants.insert().values(slug=DEFAULT_TENANT, name=DEFAULT_TENANT)
+        ).inserted_primary_key[0]
+    return tenant_id
+
+def _add_tenant_columns(conn, tenant_id: int):
+    for table in missing_tenant_columns(conn):
+        if conn.dialect.name == "sqlite":
+            # SQLite no permite agregar una columna NOT NULL sin default
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN tenant_id INTEGER NOT NULL DEFAULT {tenant_id}"))
+        else:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN tenant_id INTEGER REFERENCES tenants(id)"))
+            conn.execute(text(f"UPDATE {table} SET tenant_id = :t"), {"t": tenant_id})
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN tenant_id SET NOT NULL"))
+        print(f"{table}: tenant_id agregado")
+
+def _global_unit_name_unique(conn):
+    """Constraint o índice único sobre solo `units.name` (del esquema anterior), si existe."""
+    insp = inspect(conn)
+    for uc in insp.get_unique_constraints("units"):
+        if uc["column_names"] == ["name"]:
+            return "constraint", uc["name"]
+    for ix in insp.get_indexes("units"):
+        if ix["unique"] and ix["column_names"] == ["name"]:
+            return "index", ix["name"]
+    return None
+
+def _fix_units_unique(conn):
+    found = _global_unit_name_unique(conn)
+    if found is None:
+        return
+    kind, name = found
+    if kind == "index":
+        conn.execute(text(f"DROP INDEX {name}"))
+    elif conn.dialect.name == "sqlite":
+        # SQLite no puede borrar un UNIQUE de tabla: se reconstruye la tabla
+        conn.execute(text(
+            "CREATE TABLE units_new ("
+            " id INTEGER NOT NULL PRIMARY KEY,"
+            " tenant_id INTEGER NOT NULL REFERENCES tenants(id),"
+            " name VARCHAR(120) NOT NULL,"
+            " CONSTRAINT uq_units_tenant_name UNIQUE (tenant_id, name))"
+        ))
+        conn.execute(text("INSERT INTO units_new (id, tenant_id, name) SELECT id, tenant_id, name FROM units"))
+        conn.execute(text("DROP TABLE units"))
+        conn.execute(text("ALTER TABLE units_new RENAME TO units"))
+    else:
+        conn.execute(text(f"ALTER TABLE units DROP CONSTRAINT {name}"))
+    print("units: único global de name eliminado")
+
+    names = {uc["name"] for uc in inspect(conn).get_unique_constraints("units")}
+    if "uq_units_tenant_name" not in names:
+        conn.execute(text("ALTER TABLE units ADD CONSTRAINT uq_units_tenant_name UNIQUE (tenant_id, name)"))
+    print("units: único (tenant_id, name) creado")
+
+def _create_indexes(conn):
+    for table in TENANT_TABLES:
+        for index in Base.metadata.tables[table].indexes:
+            index.create(conn, checkfirst=True)
+
+def migrate(bind=engine):
+    Base.metadata.create_all(bind=bind, tables=[models.Tenant.__table__])
+    with bind.begin() as conn:
+        _add_tenant_columns(conn, _default_tenant_id(conn))
+        _fix_units_unique(conn)
+        _create_indexes(conn)
+    print("Migración OK")
+
+if __name__ == "__main__":
+    migrate()
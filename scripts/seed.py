@@ -3,11 +3,14 @@ Ejecuta: `python scripts/seed.py` (con el server apagado) o `uvicorn app.main:ap
 """
 from app.db import Base, engine, SessionLocal
 from app import models
+from app.tenancy import ensure_default_tenant
 
 def ensure_seed():
     Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
+        tenant_id = ensure_default_tenant(db)
+
         # Unidades base
         unit_names = [
             "Dirección de Tránsito",
@@ -17,8 +20,8 @@ def ensure_seed():
             "Dirección de Obras Municipales"
         ]
         for name in unit_names:
-            if not db.query(models.Unit).filter_by(name=name).first():
-                db.add(models.Unit(name=name))
+            if not db.query(models.Unit).filter_by(tenant_id=tenant_id, name=name).first():
+                db.add(models.Unit(tenant_id=tenant_id, name=name))
         db.commit()
 
         # Dotación
@@ -29,8 +32,8 @@ def ensure_seed():
             ("Romina Andrea Durán Durán", "Administrativa"),
         ]
         for full_name, role in users:
-            if not db.query(models.User).filter_by(full_name=full_name).first():
-                db.add(models.User(full_name=full_name, role=role))
+            if not db.query(models.User).filter_by(tenant_id=tenant_id, full_name=full_name).first():
+                db.add(models.User(tenant_id=tenant_id, full_name=full_name, role=role))
         db.commit()
         print("Seed OK")
     finally:
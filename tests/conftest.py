@@ -0,0 +1,56 @@
+import os
+import tempfile
+import uuid
+
+# La base de pruebas debe estar configurada antes de importar la app
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db import SessionLocal
+from app import models, ratelimit, tenancy
+
+BASE_DOMAIN = "juridica.test"
+
+
+@pytest.fixture(autouse=True)
+def _no_rate_limit(monkeypatch):
+    """El rate limit se prueba aparte (test_ratelimit.py)."""
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def _tenant_by_subdomain(monkeypatch):
+    monkeypatch.setattr(tenancy, "TENANT_BASE_DOMAIN", BASE_DOMAIN)
+    monkeypatch.setattr(tenancy, "TRUST_PROXY_HEADERS", False)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_tenant(db):
+    """Crea un tenant nuevo (slug único) y devuelve (id, slug)."""
+    def _make():
+        slug = "t" + uuid.uuid4().hex[:10]
+        tenant = models.Tenant(slug=slug, name=slug)
+        db.add(tenant)
+        db.commit()
+        return tenant.id, slug
+    return _make
+
+
+@pytest.fixture
+def client_for():
+    """TestClient cuyas requests se resuelven al tenant `slug` (por subdominio)."""
+    def _client(slug, **kwargs):
+        return TestClient(app, base_url=f"http://{slug}.{BASE_DOMAIN}", **kwargs)
+    return _client
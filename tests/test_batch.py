@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import event
+
+from app import models
+from app.db import engine
+
+
+@pytest.fixture
+def statements():
+    """Lista de los SQL ejecutados mientras el fixture está activo."""
+    executed = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def backlog(db, make_tenant):
+    """Tenant con 64 requerimientos sin asignar y un usuario."""
+    tenant_id, slug = make_tenant()
+    unit = models.Unit(tenant_id=tenant_id, name="SECPLA")
+    user = models.User(tenant_id=tenant_id, full_name="Ana", role="Asesora")
+    db.add_all([unit, user])
+    db.flush()
+    reqs = [models.LegalRequest(tenant_id=tenant_id, title=f"Req {i}", unit_id=unit.id) for i in range(64)]
+    db.add_all(reqs)
+    db.commit()
+    return {"slug": slug, "user": user.id, "ids": [r.id for r in reqs]}
+
+
+def _count(statements, call):
+    statements.clear()
+    response = call()
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+# Sentencias por llamada con el tenant y el snapshot ya cargados (request completo,
+# render incluido). Asignar: SELECT usuario, SELECT ids, SELECT asignaciones
+# existentes, INSERT masivo, UPDATE, 2 SELECT del refresco del snapshot y 1 de las
+# descripciones del render. Estado: lo mismo sin usuario, asignaciones ni INSERT.
+BATCH_ASSIGN_STATEMENTS = 8
+BATCH_STATUS_STATEMENTS = 5
+
+
+def test_batch_assign_statement_count_is_constant(statements, backlog, client_for):
+    client = client_for(backlog["slug"])
+    client.get("/ui/partials/priorities")  # tenant y snapshot ya cargados
+    user, ids = backlog["user"], backlog["ids"]
+
+    few = _count(statements, lambda: client.post("/ui/batch_assign", data={"request_ids": ids[:2], "user_id": user}))
+    many = _count(statements, lambda: client.post("/ui/batch_assign", data={"request_ids": ids[2:32], "user_id": user}))
+    assert few == many == BATCH_ASSIGN_STATEMENTS
+
+    api_few = _count(statements, lambda: client.post(
+        "/requests/batch/assign", json={"request_ids": ids[32:34], "user_id": user}))
+    api_many = _count(statements, lambda: client.post(
+        "/requests/batch/assign", json={"request_ids": ids[34:64], "user_id": user}))
+    assert api_few == api_many
+
+
+def test_batch_status_statement_count_is_constant(statements, backlog, client_for):
+    client = client_for(backlog["slug"])
+    client.get("/ui/partials/requests")
+    ids = backlog["ids"]
+
+    few = _count(statements, lambda: client.post("/ui/batch_status", data={"request_ids": ids[:2], "status": "COMPLETADO"}))
+    many = _count(statements, lambda: client.post("/ui/batch_status", data={"request_ids": ids[2:32], "status": "COMPLETADO"}))
+    assert few == many == BATCH_STATUS_STATEMENTS
+
+
+def test_batch_applies_to_all_rows_and_renders_once(backlog, client_for):
+    client = client_for(backlog["slug"])
+    ids = backlog["ids"][:30]
+
+    r = client.post("/ui/batch_assign", data={"request_ids": ids, "user_id": backlog["user"]})
+    assigned = {row.id for row, names, _ in r.context["priorities"] if names == ["Ana"]}
+    assert set(ids) <= assigned
+
+    r = client.post("/ui/batch_status", data={"request_ids": ids, "status": "COMPLETADO"})
+    assert {row.id for row in r.context["requests"] if row.status_name == "COMPLETADO"} == set(ids)
+    open_ids = {r.id for r in client.get("/ui/partials/assign_form").context["requests"] if r.is_open}
+    assert not open_ids & set(ids)
+
+
+def test_batch_is_all_or_nothing_across_tenants(db, backlog, make_tenant, client_for):
+    other_id, _ = make_tenant()
+    unit = models.Unit(tenant_id=other_id, name="SECPLA")
+    db.add(unit)
+    db.flush()
+    foreign = models.LegalRequest(tenant_id=other_id, title="Ajeno", unit_id=unit.id)
+    db.add(foreign)
+    db.commit()
+
+    client = client_for(backlog["slug"])
+    ids = backlog["ids"][:3] + [foreign.id]
+    assert client.post("/ui/batch_assign", data={"request_ids": ids, "user_id": backlog["user"]}).status_code == 404
+    assert client.post("/ui/batch_status", data={"request_ids": ids, "status": "COMPLETADO"}).status_code == 404
+    assert client.post("/requests/batch/assign", json={"request_ids": ids, "user_id": backlog["user"]}).status_code == 404
+    assert client.post("/requests/batch/status", json={"request_ids": ids, "status": "COMPLETADO"}).status_code == 404
+
+    db.expire_all()
+    assert db.query(models.Assignment).filter(models.Assignment.request_id.in_(ids)).count() == 0
+    assert {r.status for r in db.query(models.LegalRequest).filter(models.LegalRequest.id.in_(ids))} == {"PENDIENTE"}
+
+
+def test_batch_errors_map_to_http(backlog, client_for):
+    client = client_for(backlog["slug"])
+    ids = backlog["ids"][:2]
+    assert client.post("/requests/batch/status", json={"request_ids": ids, "status": "X"}).status_code == 400
+    assert client.post("/ui/batch_status", data={"request_ids": ids, "status": "X"}).status_code == 400
+    assert client.post("/requests/batch/assign", json={"request_ids": ids, "user_id": 10**9}).status_code == 404
+    assert client.post("/ui/batch_status", data={"status": "COMPLETADO"}).status_code == 422
@@ -0,0 +1,70 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.tenancy import missing_tenant_columns
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "migrate_tenants.py"
+
+# Esquema previo al modo multi-tenant, tal como lo dejaba create_all en SQLite
+OLD_SCHEMA = [
+    "CREATE TABLE units (id INTEGER NOT NULL, name VARCHAR(120) NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE TABLE users (id INTEGER NOT NULL, full_name VARCHAR(160) NOT NULL, role VARCHAR(60) NOT NULL,"
+    " PRIMARY KEY (id))",
+    "CREATE TABLE legal_requests (id INTEGER NOT NULL, title VARCHAR(200) NOT NULL, description TEXT,"
+    " unit_id INTEGER NOT NULL, complexity INTEGER, due_date DATE, status VARCHAR(20),"
+    " created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), PRIMARY KEY (id), FOREIGN KEY(unit_id) REFERENCES units (id))",
+    "CREATE TABLE assignments (id INTEGER NOT NULL, request_id INTEGER NOT NULL, assignee_id INTEGER NOT NULL,"
+    " PRIMARY KEY (id), FOREIGN KEY(request_id) REFERENCES legal_requests (id),"
+    " FOREIGN KEY(assignee_id) REFERENCES users (id))",
+    "INSERT INTO units (id, name) VALUES (1, 'SECPLA')",
+    "INSERT INTO users (id, full_name, role) VALUES (1, 'Ana', 'Asesora')",
+    "INSERT INTO legal_requests (id, title, unit_id, complexity, status) VALUES (1, 'Req', 1, 2, 'PENDIENTE')",
+    "INSERT INTO assignments (id, request_id, assignee_id) VALUES (1, 1, 1)",
+]
+
+
+@pytest.fixture
+def migrate_tenants():
+    spec = importlib.util.spec_from_file_location("migrate_tenants", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for stmt in OLD_SCHEMA:
+            conn.execute(text(stmt))
+    yield engine
+    engine.dispose()
+
+
+def test_migration_adds_columns_backfills_and_rebuilds_indexes(migrate_tenants, old_engine):
+    assert missing_tenant_columns(old_engine) == ["units", "users", "legal_requests", "assignments"]
+
+    migrate_tenants.migrate(old_engine)
+    migrate_tenants.migrate(old_engine)  # idempotente
+
+    assert missing_tenant_columns(old_engine) == []
+    insp = inspect(old_engine)
+    assert [uc["column_names"] for uc in insp.get_unique_constraints("units")] == [["tenant_id", "name"]]
+    index_names = {ix["name"] for table in ("users", "legal_requests", "assignments") for ix in insp.get_indexes(table)}
+    assert {"ix_legal_requests_tenant_status", "ix_assignments_tenant_request", "ix_users_tenant_full_name"} <= index_names
+
+    with old_engine.begin() as conn:
+        default_id = conn.execute(text("SELECT id FROM tenants WHERE slug = 'default'")).scalar()
+        for table in ("units", "users", "legal_requests", "assignments"):
+            assert conn.execute(text(f"SELECT DISTINCT tenant_id FROM {table}")).scalars().all() == [default_id]
+        assert conn.execute(text("SELECT title FROM legal_requests")).scalar() == "Req"
+
+        # El mismo nombre de unidad ya se permite en otro tenant, no en el mismo
+        other = conn.execute(text("INSERT INTO tenants (slug, name) VALUES ('otro', 'Otro')")).lastrowid
+        conn.execute(text("INSERT INTO units (tenant_id, name) VALUES (:t, 'SECPLA')"), {"t": other})
+    with pytest.raises(IntegrityError), old_engine.begin() as conn:
+        conn.execute(text("INSERT INTO units (tenant_id, name) VALUES (:t, 'SECPLA')"), {"t": default_id})
@@ -0,0 +1,154 @@
+import pytest
+
+from app import models, ratelimit, tenancy
+from app.core import config
+from app.ratelimit import ConcurrencyGate, RateLimiter, route_group
+
+
+# ---------- unidades ----------
+
+def test_burst_then_refill():
+    limiter = RateLimiter({"g": (2.0, 3)})
+    assert [limiter.take("g", "c", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take("g", "c", now=0.0) == pytest.approx(0.5)
+    assert limiter.take("g", "c", now=0.5) == 0.0          # recargó 1 token
+    assert limiter.take("g", "c", now=0.5) == pytest.approx(0.5)
+    assert limiter.take("g", "c", now=100.0) == 0.0        # nunca supera la ráfaga
+    assert [limiter.take("g", "c", now=100.0) for _ in range(3)][-1] > 0
+    assert limiter.take("g", "otro", now=0.0) == 0.0       # buckets independientes
+    assert limiter.metrics()["g"]["rejected"] == 3
+
+
+def test_buckets_are_capped_by_lru(monkeypatch):
+    monkeypatch.setattr(ratelimit, "MAX_BUCKETS", 2)
+    limiter = RateLimiter({"g": (1.0, 1)})
+    limiter.take("g", "a", now=0.0)
+    limiter.take("g", "b", now=0.0)
+    limiter.take("g", "a", now=0.1)   # "a" pasa a ser el más reciente
+    limiter.take("g", "c", now=0.2)   # se descarta "b"
+    assert list(limiter._buckets) == [("g", "a"), ("g", "c")]
+
+
+def test_concurrency_gate_rejects_when_full():
+    gate = ConcurrencyGate(limit=1, retry_after=2)
+    assert gate.try_enter()
+    assert not gate.try_enter()
+    gate.leave()
+    assert gate.try_enter()
+    assert gate.metrics() == {"limit": 1, "in_flight": 1, "peak": 1, "rejected": 1}
+
+
+@pytest.mark.parametrize("value", ["0,20", "-1,20", "5,0"])
+def test_rate_limit_config_rejects_non_positive(monkeypatch, value):
+    monkeypatch.setenv("RATE_LIMIT_X", value)
+    with pytest.raises(ValueError, match="RATE_LIMIT_X"):
+        config._rate_limit("RATE_LIMIT_X", "5,20")
+
+
+def test_rate_limit_config_parses():
+    assert config._rate_limit("RATE_LIMIT_X", "2.5,10") == (2.5, 10)
+
+
+@pytest.mark.parametrize("method,path,group", [
+    ("GET", "/ui", "pages"),
+    ("GET", "/ui/reports", "pages"),
+    ("GET", "/ui/partials/priorities", "partials"),
+    ("POST", "/ui/set_status", "actions"),
+    ("GET", "/requests/", "api"),
+    ("GET", "/health", None),
+    ("GET", "/metrics", None),
+])
+def test_route_group(method, path, group):
+    assert route_group(method, path) == group
+
+
+# ---------- middleware ----------
+
+@pytest.fixture
+def limited(monkeypatch):
+    """Rate limit activo, contadores en cero y reloj congelado (sin recarga entre requests)."""
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: 1000.0)
+    ratelimit.limiter.reset()
+    yield ratelimit.limiter
+    ratelimit.limiter.reset()
+
+
+@pytest.fixture
+def tenant_request(db, make_tenant):
+    tenant_id, slug = make_tenant()
+    unit = models.Unit(tenant_id=tenant_id, name="SECPLA")
+    db.add(unit)
+    db.flush()
+    req = models.LegalRequest(tenant_id=tenant_id, title="Req", unit_id=unit.id)
+    db.add(req)
+    db.commit()
+    tenancy.tenant_id_for(db, slug)   # el limiter solo separa tenants ya resueltos
+    return slug, req.id
+
+
+def test_21st_quick_action_gets_429(limited, tenant_request, client_for):
+    slug, request_id = tenant_request
+    client = client_for(slug)
+    data = {"request_id": request_id, "status": "PENDIENTE"}
+    _, burst = limited.limits["actions"]
+    assert burst == 20
+
+    codes = [client.post("/ui/set_status", data=data).status_code for _ in range(burst)]
+    assert codes == [200] * burst
+    r = client.post("/ui/set_status", data=data)
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"   # 1 token a 5/s = 0.2 s, redondeado hacia arriba
+
+    m = client.get("/metrics").json()["rate_limit"]["actions"]
+    assert (m["allowed"], m["rejected"]) == (20, 1)
+
+
+def test_retry_after_reflects_refill_time(monkeypatch, limited, tenant_request, client_for):
+    slug, _ = tenant_request
+    monkeypatch.setitem(limited.limits, "partials", (0.1, 1))
+    client = client_for(slug)
+    assert client.get("/ui/partials/priorities").status_code == 200
+    r = client.get("/ui/partials/priorities")
+    assert r.status_code == 429 and r.headers["Retry-After"] == "10"
+
+
+def test_buckets_are_per_tenant(monkeypatch, limited, db, make_tenant, client_for):
+    monkeypatch.setitem(limited.limits, "pages", (0.1, 1))
+    (_, a), (_, b) = make_tenant(), make_tenant()
+    tenancy.tenant_id_for(db, a)
+    tenancy.tenant_id_for(db, b)
+    assert client_for(a).get("/ui").status_code == 200
+    assert client_for(a).get("/ui").status_code == 429
+    assert client_for(b).get("/ui").status_code == 200
+
+
+def test_rotating_host_shares_one_bucket(monkeypatch, limited, client_for):
+    monkeypatch.setitem(limited.limits, "pages", (0.1, 1))
+    codes = [client_for(f"x{i}").get("/ui").status_code for i in range(50)]
+    assert codes[0] == 404                 # tenant inexistente, pero consume el token
+    assert set(codes[1:]) == {429}
+    assert limited.metrics()["buckets"] == 1
+
+
+def test_forwarded_ip_only_with_trusted_proxy(monkeypatch, limited, tenant_request, client_for):
+    slug, _ = tenant_request
+    monkeypatch.setitem(limited.limits, "pages", (0.1, 1))
+
+    def get(ip):
+        return client_for(slug).get("/ui", headers={"X-Forwarded-For": f"1.1.1.1, {ip}"}).status_code
+
+    assert (get("10.0.0.1"), get("10.0.0.2")) == (200, 429)   # sin proxy de confianza: misma IP
+    limited.reset()
+    monkeypatch.setattr(ratelimit, "TRUST_PROXY_HEADERS", True)
+    assert (get("10.0.0.1"), get("10.0.0.2"), get("10.0.0.1")) == (200, 200, 429)
+
+
+def test_concurrency_cap_returns_503(monkeypatch, limited, tenant_request, client_for):
+    slug, _ = tenant_request
+    monkeypatch.setattr(ratelimit.db_gate, "limit", 0)
+    r = client_for(slug).get("/ui/reports")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(ratelimit.db_gate.retry_after)
+    assert client_for(slug).get("/health").status_code == 200
+    assert client_for(slug).get("/metrics").json()["db_concurrency"]["rejected"] >= 1
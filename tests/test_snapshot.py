@@ -0,0 +1,258 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import models
+from app.routers.priorities import compute_score
+from app.snapshot import score_values, snapshot_for
+
+
+# ---------- datos ----------
+
+@pytest.fixture
+def seeded(db, make_tenant):
+    """Backlog variado: vencidos, por vencer, sin fecha, completados y sin asignar."""
+    tenant_id, slug = make_tenant()
+    units = [models.Unit(tenant_id=tenant_id, name=n) for n in ("SECPLA", "DIDECO")]
+    users = [models.User(tenant_id=tenant_id, full_name=n, role="Asesor") for n in ("Ana", "Beto", "Caro")]
+    db.add_all(units + users)
+    db.commit()
+
+    today = date.today()
+    now = datetime.now()
+    specs = [
+        # (días hasta vencer, complejidad, estado, días de antigüedad, índices de asignados)
+        (-5, 3, "PENDIENTE", 90, (0,)),
+        (-1, 1, "PENDIENTE", 45, ()),
+        (0, 2, "PENDIENTE", 40, (0, 1)),
+        (3, 2, "PENDIENTE", 30, ()),
+        (5, 3, "COMPLETADO", 20, (2,)),
+        (7, 1, "PENDIENTE", 15, (1,)),
+        (10, 2, "PENDIENTE", 10, (2,)),
+        (14, 3, "PENDIENTE", 8, ()),
+        (20, 1, "PENDIENTE", 5, (0, 2)),
+        (None, 2, "PENDIENTE", 3, (1,)),
+        (None, 3, "COMPLETADO", 2, ()),
+        (45, 2, "PENDIENTE", 0, (0,)),
+    ]
+    for i, (due, complexity, status, age, assignees) in enumerate(specs):
+        r = models.LegalRequest(
+            tenant_id=tenant_id,
+            title=f"Req {i}",
+            description=f"Detalle {i}" if i % 2 else None,
+            unit_id=units[i % 2].id,
+            complexity=complexity,
+            due_date=today + timedelta(days=due) if due is not None else None,
+            status=status,
+            created_at=now - timedelta(days=age),
+        )
+        db.add(r)
+        db.flush()
+        for idx in assignees:
+            db.add(models.Assignment(tenant_id=tenant_id, request_id=r.id, assignee_id=users[idx].id))
+    db.commit()
+    return tenant_id, slug
+
+
+# ---------- referencia ORM (lógica previa al snapshot) ----------
+
+def orm_requests(db, tenant_id):
+    return db.query(models.LegalRequest).filter(models.LegalRequest.tenant_id == tenant_id).all()
+
+
+def orm_priorities(db, tenant_id):
+    items = [
+        (r.id, sorted(a.assignee.full_name for a in r.assignments), compute_score(r))
+        for r in orm_requests(db, tenant_id)
+        if r.status != "COMPLETADO"
+    ]
+    return sorted(items, key=lambda t: (-t[2], t[0]))
+
+
+def orm_upcoming(db, tenant_id):
+    today = date.today()
+    items = []
+    for r in orm_requests(db, tenant_id):
+        if r.status != "COMPLETADO" and r.due_date and -3 <= (r.due_date - today).days <= 14:
+            names = sorted(a.assignee.full_name for a in r.assignments)
+            items.append((r.id, r.due_date, names, r.unit.name, compute_score(r)))
+    return sorted(items, key=lambda t: (t[1], -t[4], t[0]))
+
+
+def orm_reports(db, tenant_id):
+    today = date.today()
+    reqs = orm_requests(db, tenant_id)
+    per_user = defaultdict(int)
+    unit_total = defaultdict(int)
+    status_counts = {"SIN_ASIGNAR": 0, "PENDIENTE": 0, "COMPLETADO": 0}
+    aging = {"0-7": 0, "8-30": 0, "31-60": 0, ">60": 0}
+    due_soon_unassigned = 0
+    for r in reqs:
+        unit_total[r.unit.name] += 1
+        if r.status != "COMPLETADO":
+            for a in r.assignments:
+                per_user[a.assignee.full_name] += 1
+        if not r.assignments:
+            status_counts["SIN_ASIGNAR"] += 1
+        else:
+            status_counts["COMPLETADO" if r.status == "COMPLETADO" else "PENDIENTE"] += 1
+        age = (today - r.created_at.date()).days
+        aging["0-7" if age <= 7 else "8-30" if age <= 30 else "31-60" if age <= 60 else ">60"] += 1
+        if (r.due_date and 0 <= (r.due_date - today).days <= 7 and not r.assignments
+                and r.status != "COMPLETADO"):
+            due_soon_unassigned += 1
+    return {
+        "per_user": dict(per_user),
+        "unit_total": dict(unit_total),
+        "status": status_counts,
+        "aging": aging,
+        "due_soon_unassigned": due_soon_unassigned,
+    }
+
+
+# ---------- vistas servidas desde el snapshot ----------
+
+def test_priorities_partial_matches_orm(db, seeded, client_for):
+    tenant_id, slug = seeded
+    ctx = client_for(slug).get("/ui/partials/priorities").context
+    scores = [score for _, _, score in ctx["priorities"]]
+    assert scores == sorted(scores, reverse=True)
+    got = sorted(((r.id, sorted(names), score) for r, names, score in ctx["priorities"]),
+                 key=lambda t: (-t[2], t[0]))
+    assert got == orm_priorities(db, tenant_id)
+
+
+def test_priorities_only_fetch_rendered_descriptions(db, seeded, client_for):
+    tenant_id, slug = seeded
+    ctx = client_for(slug).get("/ui/partials/priorities").context
+    rendered = {r.id for r, _, _ in ctx["priorities"]}
+    assert set(ctx["descriptions"]) <= rendered
+    expected = {r.id: r.description for r in orm_requests(db, tenant_id) if r.id in rendered and r.description}
+    assert ctx["descriptions"] == expected
+
+
+def test_home_matches_orm(db, seeded, client_for):
+    tenant_id, slug = seeded
+    ctx = client_for(slug).get("/ui").context
+    got = [
+        (i["request"].id, i["request"].due_date, sorted(i["assignees"]), i["unit"], i["score"])
+        for i in ctx["upcoming"]
+    ]
+    assert sorted(got, key=lambda t: (t[1], -t[4], t[0])) == orm_upcoming(db, tenant_id)
+    assert [t[1] for t in got] == sorted(t[1] for t in got)
+
+
+def test_reports_match_orm(db, seeded, client_for):
+    tenant_id, slug = seeded
+    ctx = client_for(slug).get("/ui/reports").context
+    expected = orm_reports(db, tenant_id)
+    assert dict(zip(ctx["user_labels"], ctx["user_open_counts"])) == expected["per_user"]
+    assert dict(zip(ctx["unit_labels"], ctx["unit_total_vals"])) == expected["unit_total"]
+    assert dict(zip(ctx["status_labels"], ctx["status_vals"])) == expected["status"]
+    assert dict(zip(ctx["aging_labels"], ctx["aging_vals"])) == expected["aging"]
+    assert ctx["due_soon_unassigned"] == expected["due_soon_unassigned"]
+
+
+def test_requests_partial_matches_orm(db, seeded, client_for):
+    tenant_id, slug = seeded
+    ctx = client_for(slug).get("/ui/partials/requests").context
+    got = [(r.id, r.status_name, r.due_date, len(r.assignees)) for r in ctx["requests"]]
+    expected = [
+        (r.id, r.status, r.due_date, len(r.assignments))
+        for r in sorted(orm_requests(db, tenant_id), key=lambda r: r.created_at, reverse=True)
+    ]
+    assert got == expected
+
+
+# ---------- escrituras visibles en el siguiente render ----------
+
+def test_ui_writes_show_up_in_next_render(seeded, client_for):
+    _, slug = seeded
+    client = client_for(slug)
+    unit_id = client.get("/units/").json()[0]["id"]
+
+    client.post("/ui/create_user", data={"full_name": "Dora", "role": "Asesora"})
+    user_id = next(u["id"] for u in client.get("/users/").json() if u["full_name"] == "Dora")
+
+    client.post("/ui/create_request", data={"title": "Nuevo UI", "unit_id": unit_id})
+    req = client.get("/ui/partials/requests").context["requests"][0]
+    assert req.title == "Nuevo UI"
+
+    r = client.post("/ui/assign", data={"request_id": req.id, "user_id": user_id})
+    assert any(row.id == req.id and names == ["Dora"] for row, names, _ in r.context["priorities"])
+
+    r = client.post("/ui/set_status", data={"request_id": req.id, "status": "COMPLETADO"})
+    assert next(row for row in r.context["requests"] if row.id == req.id).status_name == "COMPLETADO"
+    assert req.id not in {row.id for row, _, _ in client.get("/ui/partials/priorities").context["priorities"]}
+
+
+def test_api_writes_show_up_in_next_render(seeded, client_for):
+    _, slug = seeded
+    client = client_for(slug)
+    client.get("/ui/partials/priorities")  # snapshot cargado antes de escribir
+
+    unit_id = client.post("/units/", json={"name": "Obras"}).json()["id"]
+    user_id = client.post("/users/", json={"full_name": "Eli", "role": "Asesor"}).json()["id"]
+    req_id = client.post("/requests/", json={"title": "Nuevo API", "unit_id": unit_id}).json()["id"]
+    client.post(f"/requests/{req_id}/assign/{user_id}")
+
+    ctx = client.get("/ui/partials/priorities").context
+    _, names, _ = next(item for item in ctx["priorities"] if item[0].id == req_id)
+    assert names == ["Eli"]
+    assert snapshot_for(seeded[0]).unit_name(unit_id) == "Obras"
+
+
+def test_ttl_reload_picks_up_external_writes(db, seeded):
+    tenant_id, _ = seeded
+    snapshot = snapshot_for(tenant_id)
+    snapshot.ensure_loaded(db)
+    before = len(snapshot.rows())
+
+    unit_id = db.query(models.Unit).filter_by(tenant_id=tenant_id).first().id
+    db.add(models.LegalRequest(tenant_id=tenant_id, title="Externo", unit_id=unit_id))
+    db.commit()
+
+    snapshot.ensure_loaded(db)
+    assert len(snapshot.rows()) == before  # aún vigente
+    snapshot.loaded_at -= snapshot.ttl
+    snapshot.ensure_loaded(db)
+    assert len(snapshot.rows()) == before + 1
+
+
+# ---------- score ----------
+
+@pytest.mark.parametrize("due", [None, -10, 0, 1, 15, 29, 30, 60])
+@pytest.mark.parametrize("complexity", [1, 2, 3])
+@pytest.mark.parametrize("age", [0, 30, 59, 60, 200])
+def test_score_values_matches_compute_score(due, complexity, age):
+    today = date.today()
+    req = models.LegalRequest(
+        complexity=complexity,
+        due_date=today + timedelta(days=due) if due is not None else None,
+        created_at=datetime.now() - timedelta(days=age),
+    )
+    due_ord = req.due_date.toordinal() if req.due_date else None
+    created_ord = req.created_at.date().toordinal()
+    assert score_values(due_ord, complexity, created_ord, today.toordinal()) == compute_score(req)
+
+
+def test_refresh_picks_up_users_created_elsewhere(db, seeded, client_for):
+    tenant_id, slug = seeded
+    client = client_for(slug)
+    client.get("/ui/reports")  # snapshot cargado
+
+    # Usuario y unidad creados fuera de este worker (otro proceso, script)
+    user = models.User(tenant_id=tenant_id, full_name="Externa", role="Asesora")
+    unit = models.Unit(tenant_id=tenant_id, name="Externa")
+    db.add_all([user, unit])
+    db.commit()
+    req_id = client.post("/requests/", json={"title": "Con externos", "unit_id": unit.id}).json()["id"]
+    assert client.post("/ui/assign", data={"request_id": req_id, "user_id": user.id}).status_code == 200
+
+    r = client.get("/ui/reports")
+    assert r.status_code == 200
+    assert "Externa" in r.context["user_labels"]
+    assert "Externa" in r.context["unit_labels"]
+    priorities = client.get("/ui/partials/priorities").context["priorities"]
+    assert next(names for row, names, _ in priorities if row.id == req_id) == ["Externa"]
@@ -0,0 +1,99 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app import models, tenancy
+
+
+@pytest.fixture
+def two_tenants(db, make_tenant):
+    """Dos municipalidades con una unidad del mismo nombre, un usuario y un requerimiento cada una."""
+    data = {}
+    for key in ("a", "b"):
+        tenant_id, slug = make_tenant()
+        unit = models.Unit(tenant_id=tenant_id, name="SECPLA")
+        user = models.User(tenant_id=tenant_id, full_name=f"Usuario {key}", role="Asesor")
+        db.add_all([unit, user])
+        db.flush()
+        req = models.LegalRequest(tenant_id=tenant_id, title=f"Req {key}", unit_id=unit.id)
+        db.add(req)
+        db.flush()
+        db.add(models.Assignment(tenant_id=tenant_id, request_id=req.id, assignee_id=user.id))
+        db.commit()
+        data[key] = {"slug": slug, "unit": unit.id, "user": user.id, "request": req.id}
+    return data
+
+
+def test_lists_only_show_own_rows(two_tenants, client_for):
+    a, b = two_tenants["a"], two_tenants["b"]
+    client = client_for(a["slug"])
+
+    assert [r["id"] for r in client.get("/requests/").json()] == [a["request"]]
+    assert [u["id"] for u in client.get("/users/").json()] == [a["user"]]
+    assert [u["id"] for u in client.get("/units/").json()] == [a["unit"]]
+    assert [t["request"]["id"] for t in client.get("/priorities/").json()] == [a["request"]]
+
+    for path in ("/ui/partials/requests", "/ui/partials/priorities", "/ui/partials/assign_form",
+                 "/ui/partials/users", "/ui/reports", "/ui/requests"):
+        text = client.get(path).text
+        assert "Req b" not in text and "Usuario b" not in text, path
+
+    ctx = client.get("/ui/reports").context
+    assert ctx["user_labels"] == ["Usuario a"]
+    assert sum(ctx["unit_total_vals"]) == 1
+
+
+def test_other_tenant_ids_are_not_found(db, two_tenants, client_for):
+    a, b = two_tenants["a"], two_tenants["b"]
+    client = client_for(a["slug"])
+
+    assert client.post("/ui/assign", data={"request_id": b["request"], "user_id": a["user"]}).status_code == 404
+    assert client.post("/ui/assign", data={"request_id": a["request"], "user_id": b["user"]}).status_code == 404
+    assert client.post("/ui/set_status", data={"request_id": b["request"], "status": "COMPLETADO"}).status_code == 404
+    assert client.post(f"/requests/{b['request']}/assign/{a['user']}").status_code == 404
+    assert client.post(f"/requests/{a['request']}/assign/{b['user']}").status_code == 404
+    assert client.post("/requests/", json={"title": "x", "unit_id": b["unit"]}).status_code == 404
+    assert client.post("/ui/create_request", data={"title": "x", "unit_id": b["unit"]}).status_code == 404
+
+    db.expire_all()
+    assert db.get(models.LegalRequest, b["request"]).status == "PENDIENTE"
+    assert db.query(models.Assignment).filter_by(request_id=b["request"]).count() == 1
+
+
+def test_unit_name_is_unique_per_tenant(two_tenants, client_for):
+    a = two_tenants["a"]
+    client = client_for(a["slug"])
+    # "SECPLA" ya existe en ambos tenants; solo choca dentro del mismo
+    assert client.post("/units/", json={"name": "SECPLA"}).status_code == 400
+    assert client.post("/ui/create_unit", data={"name": "SECPLA"}).status_code == 400
+    assert client.post("/units/", json={"name": "DIDECO"}).status_code == 200
+
+
+def test_header_is_ignored_without_trusted_proxy(two_tenants, client_for):
+    a, b = two_tenants["a"], two_tenants["b"]
+    client = client_for(a["slug"], headers={"X-Tenant": b["slug"]})
+    assert [r["id"] for r in client.get("/requests/").json()] == [a["request"]]
+
+
+def test_trusted_header_must_match_host(monkeypatch, two_tenants, client_for):
+    a, b = two_tenants["a"], two_tenants["b"]
+    monkeypatch.setattr(tenancy, "TRUST_PROXY_HEADERS", True)
+    assert client_for(a["slug"], headers={"X-Tenant": b["slug"]}).get("/requests/").status_code == 400
+    assert client_for(a["slug"], headers={"X-Tenant": a["slug"]}).get("/requests/").status_code == 200
+
+
+def test_trusted_header_without_base_domain(monkeypatch, two_tenants):
+    b = two_tenants["b"]
+    monkeypatch.setattr(tenancy, "TENANT_BASE_DOMAIN", "")
+    monkeypatch.setattr(tenancy, "TRUST_PROXY_HEADERS", True)
+    client = TestClient(app, headers={"X-Tenant": b["slug"]})
+    assert [r["id"] for r in client.get("/requests/").json()] == [b["request"]]
+
+
+def test_unknown_host_and_tenant_are_rejected(client_for):
+    assert TestClient(app, base_url="http://otro.example").get("/requests/").status_code == 400
+    assert client_for("noexiste").get("/requests/").status_code == 404
+
+
+def test_tenants_cannot_be_created_over_http():
+    assert TestClient(app).post("/tenants/", json={"slug": "x", "name": "x"}).status_code in (404, 405)